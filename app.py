@@ -10,7 +10,7 @@ from folium.plugins import MarkerCluster
 from streamlit_folium import st_folium
 
 from utils.data_storage import get_city_events, save_city_events
-from utils.event_finder import find_traffic_events
+from utils.event_finder import dedup_events, find_traffic_events_batch
 from utils.geo_tagger import geo_tag_events
 from utils.location_utils import get_cities_for_country, get_country_options
 from utils.date_utils import parse_date, format_date
@@ -28,6 +28,15 @@ def get_website_name(url):
             return match.group(1).split('.')[0]
     return url
 
+# Impact circle (radius in meters, fill opacity, border weight) per traffic impact level.
+# Larger circles get a lower opacity and thinner border.
+IMPACT_CIRCLE_STYLES = {
+    'high': (1000, 0.1, 1),
+    'medium': (500, 0.15, 2),
+    'low': (250, 0.2, 3),
+}
+DEFAULT_IMPACT_CIRCLE_STYLE = (250, 0.2, 2)  # Unknown impact
+
 # Helper function to create map with events
 def create_event_map(events):
     """Create a folium map with events plotted as markers with popups and radius circles"""
@@ -82,22 +91,7 @@ def create_event_map(events):
         impact = event.get('traffic_impact', 'unknown').lower()
         
         # Set circle radius based on traffic impact (in meters)
-        if impact == 'high':
-            radius_m = 1000  # 1000 meters for high impact
-            fill_opacity = 0.1  # Lower opacity for large circles
-            weight = 1  # Thinner border
-        elif impact == 'medium':
-            radius_m = 500   # 500 meters for medium impact
-            fill_opacity = 0.15
-            weight = 2
-        elif impact == 'low':
-            radius_m = 250   # 250 meters for low impact
-            fill_opacity = 0.2
-            weight = 3  # Thicker border
-        else:
-            radius_m = 250   # Default to 250 meters for unknown impact
-            fill_opacity = 0.2
-            weight = 2
+        radius_m, fill_opacity, weight = IMPACT_CIRCLE_STYLES.get(impact, DEFAULT_IMPACT_CIRCLE_STYLE)
         
         # Get radius in km for display
         radius_km = radius_m / 1000
@@ -355,11 +349,12 @@ if search_button and selected_city:
             try:
                 st.write("Finding traffic events...")
                 event_types = ["concert/ live shows/ sport event", "road closure/ construction", "public protest/ demonstration/ gathering"]
+                events_by_type = find_traffic_events_batch(selected_city, selected_country_code, start_date=start_date, end_date=end_date, event_types=event_types)
                 all_events = []
-                for event_type in event_types:
-                    events = find_traffic_events(selected_city, selected_country_code, start_date=start_date, end_date=end_date, event_type=event_type)
+                for event_type, events in events_by_type.items():
                     st.write(f"Found {len(events)} traffic-affecting events for {event_type} category.")
                     all_events.extend(events)
+                all_events = dedup_events(all_events)
                 
                 if all_events:
                     st.write(f"Found {len(all_events)} traffic-affecting events")
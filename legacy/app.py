@@ -4,7 +4,7 @@ import streamlit as st
 import json
 
 from utils.data_storage import get_city_events, save_city_events
-from utils.event_detector import extract_event_from_article
+from utils.event_detector import iter_events_from_articles
 from utils.location_utils import get_cities_for_country, get_country_options
 from utils.news_fetcher import fetch_news
 from utils.event_finder import find_traffic_events, generate_mock_events
@@ -15,6 +15,36 @@ st.set_page_config(
     layout="wide"
 )
 
+class EmptyNewsPage(Exception):
+    """Raised for a page with no articles so st.cache_data doesn't keep it"""
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fetch_news_page_cached(query, days, page):
+    articles, total_results = fetch_news(query=query, days=days, page=page)
+    # fetch_news also returns an empty page when the request fails, so an
+    # empty result isn't cached and the next rerun asks NewsAPI again
+    if not articles:
+        raise EmptyNewsPage()
+    return articles, total_results
+
+def fetch_news_page(query, days, page):
+    """Fetch one page of news, cached so reruns with the same arguments skip NewsAPI"""
+    try:
+        return _fetch_news_page_cached(query, days, page)
+    except EmptyNewsPage:
+        return [], 0
+
+def events_to_dataframe(events):
+    """Build the display table column by column instead of one dict per event"""
+    return pd.DataFrame({
+        "Type": [event.get('event_type', 'Unknown') for event in events],
+        "Location": [event.get('location', 'Unknown') for event in events],
+        "Date": [event.get('date', 'Unknown') for event in events],
+        "Time": [event.get('time', 'Unknown') for event in events],
+        "Scale": [event.get('scale', 'Unknown') for event in events],
+        "City": [event.get('city_name', 'Unknown') for event in events],
+    })
+
 st.title("🚦 Traffic Event Finder")
 st.subheader("Find events that may affect traffic in your city")
 
@@ -57,23 +87,8 @@ if existing_events:
         st.success(f"Showing {len(existing_events)} saved events for {city}")
         
         # Convert to DataFrame for display
-        events_list = []
-        for event in existing_events:
-            event_dict = {
-                "Type": event.get('event_type', 'Unknown'),
-                "Location": event.get('location', 'Unknown'),
-                "Date": event.get('date', 'Unknown'),
-                "Time": event.get('time', 'Unknown'),
-                "Scale": event.get('scale', 'Unknown'),
-                "City": event.get('city_name', 'Unknown'),
-            }
-            events_list.append(event_dict)
-        
-        if events_list:
-            df = pd.DataFrame(events_list)
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info(f"No event details found in the saved data for {city}")
+        df = events_to_dataframe(existing_events)
+        st.dataframe(df, use_container_width=True)
 
 search_button = st.button("Search for Traffic Events", type="primary")
 
@@ -93,13 +108,13 @@ if search_button and city:
             total_results = 0
             
             # Fetch first page and get total count
-            articles, total_results = fetch_news(query=query, days=days, page=1)
+            articles, total_results = fetch_news_page(query, days, 1)
             all_articles.extend(articles)
             
             # Fetch additional pages if needed
             for page in range(2, min(max_pages + 1, (total_results // articles_per_page) + 2)):
                 st.write(f"Fetching page {page} of articles...")
-                more_articles, _ = fetch_news(query=query, days=days, page=page)
+                more_articles, _ = fetch_news_page(query, days, page)
                 if more_articles:
                     all_articles.extend(more_articles)
                 else:
@@ -111,19 +126,17 @@ if search_button and city:
             else:
                 st.write(f"Found {len(all_articles)} news articles about {city} (out of {total_results} total results)")
                 
-                # Process with AI - Sequential approach to avoid multiprocessing issues
+                # Articles are classified in batches, then the relevant ones are
+                # processed in worker threads; events and progress arrive here
                 st.write("Analyzing articles for traffic relevance...")
-                for i, article in enumerate(all_articles):
-                    progress = ((i + 1) / len(all_articles)) * 100
-                    
-                    # Update status message
-                    if progress % 25 == 0:
-                        st.write(f"{progress}% articles processed")
-                    
-                    # Process article
-                    event = extract_event_from_article(article, city)
-                    if event:
-                        events.append(event)
+                progress_bar = st.progress(0.0)
+                
+                def update_progress(done, total):
+                    # Update the progress bar every 16 articles and on the last one
+                    if (done & 15) == 1 or done == total:
+                        progress_bar.progress(done / total)
+                
+                events.extend(iter_events_from_articles(all_articles, city, on_progress=update_progress))
                 
                 if events:
                     st.write(f"Detected {len(events)} traffic-affecting events")
@@ -155,19 +168,7 @@ if search_button and city:
             st.toast(f"Saved event data to {os.path.basename(file_path)}", icon="✅")
         
         # Convert to DataFrame for easier display
-        events_list = []
-        for event in events:
-            event_dict = {
-                "Type": event.get('event_type', 'Unknown'),
-                "Location": event.get('location', 'Unknown'),
-                "Date": event.get('date', 'Unknown'),
-                "Time": event.get('time', 'Unknown'),
-                "Scale": event.get('scale', 'Unknown'),
-                "City": event.get('city_name', 'Unknown'),
-            }
-            events_list.append(event_dict)
-        
-        df = pd.DataFrame(events_list)
+        df = events_to_dataframe(events)
         st.dataframe(df, use_container_width=True)
     else:
         st.info(f"No traffic-affecting events detected in {city}")
@@ -1,9 +1,15 @@
+import hashlib
 import json
+import logging
 import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
 from newspaper import Article
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Iterator, List, Optional
 from pydantic import BaseModel
 
 load_dotenv()
@@ -13,44 +19,261 @@ from openai import OpenAI
 api_key = os.getenv("OPENAI_API_KEY")
 client = OpenAI(api_key=api_key)
 
+logger = logging.getLogger(__name__)
 
-def is_traffic_relevant(article: Dict[str, Any], city: str) -> bool:
-    """
-    Check if the article with given title and description
-    contains news that could affect road traffic in the specified city.
-    """
+# Number of articles classified together in one relevance request
+RELEVANCE_BATCH_SIZE = 20
+
+# Relevance answers keyed on a hash of (title, description, city), and article
+# text keyed on URL, so repeated articles skip the LLM call and the download.
+# Both are LRU-bounded. Failures are not cached, so they are retried next time.
+MAX_CACHED_ARTICLES = 512
+MAX_CACHED_RELEVANCE = 4096
+_relevance_cache: "OrderedDict[str, bool]" = OrderedDict()
+_relevance_cache_lock = threading.Lock()
+_content_cache: "OrderedDict[str, str]" = OrderedDict()
+_content_cache_lock = threading.Lock()
+
+
+# Prompt templates, filled in with str.format
+CLASSIFIER_INSTRUCTIONS = "You are a news classifier with expertise in transportation impacts. An article is considered to have 'traffic-affecting news' if it reports events such as road accidents, major construction, severe weather conditions, public demonstrations, sports events, concerts, festivals, or similar incidents that could disrupt nearby road traffic. Otherwise, it is classified as 'non-traffic-affecting."
 
-    prompt = f"""
-    You are a news classifier with expertise in transportation impacts. An article is considered to have 'traffic-affecting news' if it reports events such as road accidents, major construction, severe weather conditions, public demonstrations, sports events, concerts, festivals, or similar incidents that could disrupt nearby road traffic. Otherwise, it is classified as 'non-traffic-affecting.
+RELEVANCE_PROMPT = """
+    """ + CLASSIFIER_INSTRUCTIONS + """
 
     Given the following article information. Can it effect traffic in {city}:
     
-    Title: {article.get("title", "")}
-    Description: {article.get("description", "")}
+    Title: {title}
+    Description: {description}
     
     Classify this article as either "Yes" (if it can affect traffic) or "No" (if it cannot affect traffic) and output your answer in JSON format as follows:
 
     {{ "affect_traffic": "Yes" }}
     """
 
+RELEVANCE_BATCH_ARTICLE = """
+    ### Article {i}
+    Title: {title}
+    Description: {description}
+    """
+
+RELEVANCE_BATCH_PROMPT = """
+    """ + CLASSIFIER_INSTRUCTIONS + """
+
+    For each of the following {count} articles, decide whether it can effect traffic in {city}:
+    {article_blocks}
+    Classify each article as either "Yes" (if it can affect traffic) or "No" (if it cannot affect traffic) and output your answers in JSON format as follows, with one entry per article number:
+
+    {{ "results": [{{ "i": 1, "affect_traffic": "Yes" }}, {{ "i": 2, "affect_traffic": "No" }}] }}
+    """
+
+EXTRACTION_PROMPT = """
+    Extract events that can affect road traffic from this text. Focus on events in or near {city}.
+    For each event, provide:
+    1. Event type (concert, sport event, road closure, construction, festival, etc.)
+    2. Event name (if mentioned)
+    2. Location (as specific as possible such as venue, street name, pincode, landmark, etc. where this even is happening)
+    3. Date (date at which this event is happening as specific as possible in format DD-MM-YYYY)
+    4. Start Time (Time at which this event is happening as specific as possible such as 10:00 AM, 10:00 PM etc.)
+    5. End Time (Time at which this event is happening as specific as possible such as 10:00 AM, 10:00 PM etc.)
+    6. Traffic Impact (Expected traffic impact of this event) low, medium, high
+    7. Source (Source from where this information is found)
+    
+    If start time is not given and event likely to happen in evening, then consider start time as 18:00.
+    If no traffic-related events are found in the text, return null.
+    
+    Text: Title: {title}
+Full content: {full_content}
+    """
+
+
+# Shared request options. Relevance answers are a few tokens of JSON, so the
+# output budget is capped to match. The batched request gets a fixed allowance
+# for the wrapper plus room per article for an entry like
+# {"i": 12, "affect_traffic": "Yes"}, with slack for pretty-printed output,
+# since a truncated answer fails to parse and falls back to single calls.
+RELEVANCE_REQUEST = {
+    "model": "gpt-4o-mini",
+    "response_format": {"type": "json_object"},
+    "temperature": 0,
+    "max_tokens": 16,
+}
+RELEVANCE_BATCH_REQUEST = {**RELEVANCE_REQUEST, "max_tokens": 64 + 24 * RELEVANCE_BATCH_SIZE}
+
+
+# Word stems that show up in traffic-affecting news. Articles whose title and
+# description mention none of them are rejected without an LLM call.
+TRAFFIC_KEYWORDS_RE = re.compile(
+    r"\b(?:accident|crash|collision|pile-?up|traffic|jam|congest|road|street|"
+    r"highway|expressway|flyover|bridge|tunnel|junction|metro|closure|closed|"
+    r"shut|block|diver|detour|construct|roadwork|repair|concert|festival|fair|"
+    r"carnival|parade|procession|rally|march|marathon|race|match|game|"
+    r"tournament|stadium|cricket|football|show|protest|strike|bandh|"
+    r"demonstrat|agitation|celebrat|visit|flood|rain|storm|cyclone|snow|fog|"
+    r"fire|collapse|evacuat)",
+    re.IGNORECASE
+)
+
+
+def _may_affect_traffic(title: str, description: str) -> bool:
+    """Cheap keyword check run before asking the LLM about an article"""
+    return (TRAFFIC_KEYWORDS_RE.search(title) is not None
+            or TRAFFIC_KEYWORDS_RE.search(description) is not None)
+
+
+def _relevance_key(title: str, description: str, city: str) -> str:
+    """Cache key for an article's relevance answer"""
+    raw = f"{title}|{description}|{city}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _get_cached_relevance(key: str) -> Optional[bool]:
+    """Cached relevance answer for a key, or None if there isn't one"""
+    with _relevance_cache_lock:
+        if key in _relevance_cache:
+            _relevance_cache.move_to_end(key)
+            return _relevance_cache[key]
+    return None
+
+
+def _cache_relevance(key: str, relevant: bool) -> None:
+    """Store a relevance answer, evicting the least recently used one when full"""
+    with _relevance_cache_lock:
+        _relevance_cache[key] = relevant
+        _relevance_cache.move_to_end(key)
+        if len(_relevance_cache) > MAX_CACHED_RELEVANCE:
+            _relevance_cache.popitem(last=False)
+
+
+def is_traffic_relevant(title: str, description: str, city: str) -> bool:
+    """
+    Check if the article with given title and description
+    contains news that could affect road traffic in the specified city.
+    """
+    if not _may_affect_traffic(title, description):
+        return False
+
+    key = _relevance_key(title, description, city)
+    cached = _get_cached_relevance(key)
+    if cached is not None:
+        return cached
+
+    prompt = RELEVANCE_PROMPT.format(city=city, title=title, description=description)
+
     try:
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
+            **RELEVANCE_REQUEST
         )
 
         result = json.loads(response.choices[0].message.content)
         answer = result.get("affect_traffic", "No").lower()
         if answer == "yes":
-            print(f"print from is_traffic_relevant: {article}")
+            logger.debug("Traffic-relevant article: %s", title)
+        _cache_relevance(key, answer == "yes")
         return answer == "yes"
 
-    except Exception as e:
-        print(f"Error checking traffic relevance: {e}")
+    except Exception:
+        logger.exception("Error checking traffic relevance")
         return False
 
 
+def _classify_relevance_chunk(articles: List[Dict[str, Any]], city: str) -> List[bool]:
+    """
+    Classify a chunk of articles for traffic relevance with a single LLM call.
+    Falls back to one is_traffic_relevant call per article if the batched
+    request fails, and for any article the batched answer leaves out.
+    """
+    article_blocks = "\n".join(
+        RELEVANCE_BATCH_ARTICLE.format(
+            i=i,
+            title=article.get("title", ""),
+            description=article.get("description", "")
+        )
+        for i, article in enumerate(articles, start=1)
+    )
+    prompt = RELEVANCE_BATCH_PROMPT.format(count=len(articles), city=city, article_blocks=article_blocks)
+
+    try:
+        response = client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            **RELEVANCE_BATCH_REQUEST
+        )
+
+        result = json.loads(response.choices[0].message.content)
+        # json_object mode doesn't enforce the schema, so article numbers may
+        # come back as strings and entries may be missing or malformed
+        answers = {}
+        for entry in result.get("results", []):
+            if not isinstance(entry, dict):
+                continue
+            try:
+                i = int(entry.get("i"))
+            except (TypeError, ValueError):
+                continue
+            answers[i] = str(entry.get("affect_traffic", "No")).lower() == "yes"
+
+        relevance = []
+        for i, article in enumerate(articles, start=1):
+            title = article.get("title") or ""
+            description = article.get("description") or ""
+            if i in answers:
+                _cache_relevance(_relevance_key(title, description, city), answers[i])
+                relevance.append(answers[i])
+            else:
+                # Skipped by the model, so ask about this article on its own
+                relevance.append(is_traffic_relevant(title, description, city))
+        return relevance
+
+    except Exception:
+        logger.exception("Error checking traffic relevance for a batch, checking articles one by one")
+        return [
+            is_traffic_relevant(article.get("title") or "", article.get("description") or "", city)
+            for article in articles
+        ]
+
+
+def is_traffic_relevant_batch(articles: List[Dict[str, Any]], city: str,
+                              max_workers: int = 4) -> List[bool]:
+    """
+    Check which articles contain news that could affect road traffic in the
+    specified city, classifying RELEVANCE_BATCH_SIZE articles per LLM call.
+
+    Args:
+        articles: Articles with title and description
+        city: Name of the city
+        max_workers: Maximum number of batches classified in parallel
+
+    Returns:
+        One boolean per article, in the same order as articles
+    """
+    # Only send articles that pass the keyword check and have no cached answer
+    relevance = []
+    for article in articles:
+        title = article.get("title") or ""
+        description = article.get("description") or ""
+        if _may_affect_traffic(title, description):
+            relevance.append(_get_cached_relevance(_relevance_key(title, description, city)))
+        else:
+            relevance.append(False)
+    uncached = [i for i, relevant in enumerate(relevance) if relevant is None]
+
+    chunks = [
+        uncached[i:i + RELEVANCE_BATCH_SIZE]
+        for i in range(0, len(uncached), RELEVANCE_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda chunk: _classify_relevance_chunk([articles[i] for i in chunk], city),
+            chunks
+        )
+        for chunk, chunk_result in zip(chunks, results):
+            for i, relevant in zip(chunk, chunk_result):
+                relevance[i] = relevant
+
+    return relevance
+
+
 class TrafficEvent(BaseModel):
     event_type: str
     location: str
@@ -59,66 +282,70 @@ class TrafficEvent(BaseModel):
     scale: Optional[str] = None
 
 
+EXTRACTION_REQUEST = {
+    "model": "gpt-4o",
+    "response_format": TrafficEvent,
+    "max_tokens": 512,
+}
+
+
 def extract_event(article: Dict[str, Any], city: str) -> Optional[TrafficEvent]:
     """Extract structured event data from text using LLM"""
 
-    city_context = f"Focus on events in or near {city}."
-    text = f"Title: {article['title']}\nFull content: {article['full_content']}"
-
-    prompt = f"""
-    Extract events that can affect road traffic from this text. {city_context}
-    For each event, provide:
-    1. Event type (concert, sport event, road closure, construction, festival, etc.)
-    2. Event name (if mentioned)
-    2. Location (as specific as possible such as venue, street name, pincode, landmark, etc. where this even is happening)
-    3. Date (date at which this event is happening as specific as possible in format DD-MM-YYYY)
-    4. Start Time (Time at which this event is happening as specific as possible such as 10:00 AM, 10:00 PM etc.)
-    5. End Time (Time at which this event is happening as specific as possible such as 10:00 AM, 10:00 PM etc.)
-    6. Traffic Impact (Expected traffic impact of this event) low, medium, high
-    7. Source (Source from where this information is found)
-    
-    If start time is not given and event likely to happen in evening, then consider start time as 18:00.
-    If no traffic-related events are found in the text, return null.
-    
-    Text: {text}
-    """
+    prompt = EXTRACTION_PROMPT.format(
+        city=city,
+        title=article['title'],
+        full_content=article['full_content']
+    )
 
     try:
         completion = client.beta.chat.completions.parse(
-            model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are an expert at extracting traffic event information from news articles."},
                 {"role": "user", "content": prompt}
             ],
-            response_format=TrafficEvent
+            **EXTRACTION_REQUEST
         )
         
         if completion.choices[0].message.parsed is None:
-            print("No traffic events found in the article")
+            logger.debug("No traffic events found in the article")
             return None
             
         event = completion.choices[0].message.parsed
         return event
-    except Exception as e:
-        print(f"Error extracting event: {e}")
+    except Exception:
+        logger.exception("Error extracting event")
         return None
 
 
 def fetch_full_content(url):
     """
-    Fetch the full content of an article from its URL using newspaper3k
+    Fetch the full content of an article from its URL using newspaper3k.
+    Successful fetches are cached on the URL.
     """
+    with _content_cache_lock:
+        if url in _content_cache:
+            _content_cache.move_to_end(url)
+            return _content_cache[url]
+
     try:
         article = Article(url)
         article.download()
         article.parse()
-        return article.text
-    except Exception as e:
-        print(f"Error fetching content from URL {url}: {e}")
+    except Exception:
+        logger.exception("Error fetching content from URL %s", url)
         return ""
 
+    if article.text:
+        with _content_cache_lock:
+            _content_cache[url] = article.text
+            if len(_content_cache) > MAX_CACHED_ARTICLES:
+                _content_cache.popitem(last=False)
+    return article.text
 
-def extract_event_from_article(article: Dict[str, Any], city: str) -> Dict[str, Any]:
+
+def extract_event_from_article(article: Dict[str, Any], city: str,
+                               check_relevance: bool = True) -> Dict[str, Any]:
     """
     Process an article to extract traffic-related events for a specific city.
     
@@ -132,6 +359,8 @@ def extract_event_from_article(article: Dict[str, Any], city: str) -> Dict[str,
     Args:
         article: Dictionary containing article data with title, description, and url
         city: Name of the city
+        check_relevance: Whether to run the relevance check (pass False for
+            articles already filtered with is_traffic_relevant_batch)
         
     Returns:
         Dictionary containing structured event data with source article attached,
@@ -146,7 +375,7 @@ def extract_event_from_article(article: Dict[str, Any], city: str) -> Dict[str,
         return {}
 
     # Check if article is traffic-relevant
-    if not is_traffic_relevant(article, city):
+    if check_relevance and not is_traffic_relevant(title, description, city):
         return {}
 
     # Fetch full content of the selected articles
@@ -165,6 +394,68 @@ def extract_event_from_article(article: Dict[str, Any], city: str) -> Dict[str,
     event_dict = event.model_dump()
     event_dict["source"] = article
     event_dict["city_name"] = city
-    print(f"event: {event_dict}")
+    logger.debug("event: %s", event_dict)
 
     return event_dict
+
+
+def _dedup_articles(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop repeated articles, keeping the first occurrence. Articles are keyed
+    on their URL, or on a hash of title and description when they have none.
+    """
+    seen = set()
+    unique_articles = []
+    for article in articles:
+        key = article.get("url") or hashlib.sha1(
+            f"{article.get('title', '')}|{article.get('description', '')}".encode("utf-8")
+        ).hexdigest()
+        if key in seen:
+            continue
+        seen.add(key)
+        unique_articles.append(article)
+    return unique_articles
+
+
+def iter_events_from_articles(articles: List[Dict[str, Any]], city: str,
+                              max_workers: int = 16,
+                              on_progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Extract traffic-related events from a list of articles, yielding each
+    event as soon as its article has been processed.
+    
+    Repeated articles and those without a title or description are skipped, the rest are
+    classified with is_traffic_relevant_batch, and the relevant ones are
+    processed with extract_event_from_article in a thread pool. Events are
+    yielded in article order.
+    
+    Args:
+        articles: Articles with title, description and url
+        city: Name of the city
+        max_workers: Maximum number of articles processed in parallel
+        on_progress: Optional callback called as on_progress(done, total) after
+            each relevant article, from the thread consuming this generator
+        
+    Yields:
+        Event dictionaries with the source article attached
+    """
+    candidate_articles = [
+        article for article in _dedup_articles(articles)
+        if article.get("title") and article.get("description")
+    ]
+    relevance = is_traffic_relevant_batch(candidate_articles, city)
+    relevant_articles = [
+        article for article, relevant in zip(candidate_articles, relevance) if relevant
+    ]
+    
+    total = len(relevant_articles)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda article: extract_event_from_article(article, city, check_relevance=False),
+            relevant_articles
+        )
+        for done, event in enumerate(results, start=1):
+            if on_progress:
+                on_progress(done, total)
+            if event:
+                yield event
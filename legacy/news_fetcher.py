@@ -1,11 +1,29 @@
+import atexit
 import requests
 import os
 import random
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
+# Shared session so paginated fetches reuse one keep-alive connection to NewsAPI
+session = requests.Session()
+# Retry rate-limited and transient server errors with a short backoff instead
+# of returning an empty page. NewsAPI's Retry-After can be long, so it is
+# ignored in favour of the backoff, which keeps a rate-limited fetch from
+# blocking the app.
+session.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=False
+)))
+
+# Seconds to wait for NewsAPI to connect and to respond
+NEWS_API_TIMEOUT = 10
+atexit.register(session.close)
+
 def get_news_api_key():
     """Get News API key from environment variables"""
     return os.getenv("NEWSAPI_API_KEY")
@@ -39,7 +57,7 @@ def fetch_news(query, days=7, api_key=None, page=1, max_results=100):
     }
     
     try:
-        response = requests.get(base_url, params=params)
+        response = session.get(base_url, params=params, timeout=NEWS_API_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             return data["articles"], data.get("totalResults", 0)
@@ -60,17 +78,18 @@ def generate_mock_data(num_articles=10, city=None):
         {"type": "marathon", "location": f"Main Street in {city}" if city else "Market Street", "date": "Sunday morning"}
     ]
     
-    articles = []
-    for i in range(num_articles):
-        event = random.choice(mock_events)
-        articles.append({
+    # All mock articles share one publish timestamp
+    published_at = datetime.now().isoformat()
+    return [
+        {
             "title": f"{event['type'].title()} in {event['location']}",
             "description": f"A {event['type']} is scheduled in {event['location']} {event['date']}.",
             "content": f"A {event['type']} is scheduled in {event['location']} {event['date']}. This event is expected to draw large crowds and may affect traffic in the surrounding areas.",
-            "publishedAt": datetime.now().isoformat(),
+            "publishedAt": published_at,
             "source": {"name": "Mock News"}
-        })
-    return articles
+        }
+        for event in random.choices(mock_events, k=num_articles)
+    ]
 
 def generate_mock_data_for_city(city, num_articles=10):
     """Generate mock data customized for the given city"""
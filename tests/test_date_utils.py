@@ -0,0 +1,22 @@
+import unittest
+from datetime import date
+
+from utils.date_utils import parse_date
+
+
+class ParseDateYearFirstTest(unittest.TestCase):
+    """Year-first dates are year-month-day whatever the separator or dayfirst"""
+
+    def test_dash_and_slash_agree(self):
+        for dayfirst in (True, False):
+            with self.subTest(dayfirst=dayfirst):
+                self.assertEqual(parse_date("2025-01-02", dayfirst=dayfirst), date(2025, 1, 2))
+                self.assertEqual(parse_date("2025/01/02", dayfirst=dayfirst), date(2025, 1, 2))
+
+    def test_unpadded(self):
+        self.assertEqual(parse_date("2025-1-2"), date(2025, 1, 2))
+        self.assertEqual(parse_date("2025/1/2"), date(2025, 1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
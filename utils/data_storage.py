@@ -1,12 +1,14 @@
 import json
 import os
 import re
+import threading
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from utils.date_utils import (
-    parse_date, format_date, 
-    do_date_ranges_overlap, DATETIME_ISO_FORMAT
+    parse_date, format_date, DATETIME_ISO_FORMAT
 )
 
 # Define default data directory and events file path
@@ -17,6 +19,20 @@ EXTRACTED_CITY_DATA_DIR = os.path.join(DEFAULT_DATA_DIR, "extracted_city_data")
 os.makedirs(DEFAULT_DATA_DIR, exist_ok=True)
 os.makedirs(EXTRACTED_CITY_DATA_DIR, exist_ok=True)
 
+# Parsed city files keyed by path. Each entry holds the file's (mtime, size)
+# signature, its events and their IDs, and is reused while the signature matches.
+_city_file_cache: Dict[str, Tuple[Tuple[int, int], List[Dict[str, Any]], Set[str]]] = {}
+
+# Date index per city file, built from the cached events list. Each index holds
+# the events with a usable start date sorted by start date, parallel lists of
+# their parsed start and end dates, and the earliest start / latest end.
+_city_date_index_cache: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Any]]] = {}
+
+# Characters stripped from event ID components
+NON_WORD_RE = re.compile(r'[^\w]')
+# Same, but keeping the \x1f separator get_event_id uses between components
+ID_FUSED_CLEAN_RE = re.compile(r'[^\w\x1f]')
+
 def clean_id_component(text: str) -> str:
     """
     Clean a string for use in an ID by:
@@ -30,10 +46,7 @@ def clean_id_component(text: str) -> str:
     Returns:
         str: Cleaned text suitable for use in an ID
     """
-    cleaned = text.lower().replace(' ', '_')
-    cleaned = re.sub(r'[^\w]', '', cleaned)
-    
-    return cleaned
+    return NON_WORD_RE.sub('', text.lower().replace(' ', '_'))
 
 def get_event_id(event: Dict[str, Any]) -> str:
     """
@@ -45,14 +58,109 @@ def get_event_id(event: Dict[str, Any]) -> str:
     Returns:
         str: A unique ID string for the event
     """
-    event_type = clean_id_component(event.get('event_type', 'unknown'))
-    location = clean_id_component(event.get('location', 'unknown'))
+    # Clean all three components in one pass: join them with a unit separator,
+    # which survives the cleaning pattern, then turn it into the "_" delimiter.
+    # Equivalent to cleaning each component with clean_id_component.
+    raw = f"{event.get('event_type', 'unknown')}\x1f{event.get('location', 'unknown')}\x1f{event.get('start_date', 'unknown')}"
+    return ID_FUSED_CLEAN_RE.sub('', raw.lower().replace(' ', '_')).replace('\x1f', '_')
 
-    date_field = event.get('start_date', "unknown")
-    date = clean_id_component(date_field)
+
+def get_city_file_path(country_code: str, city_name: str) -> str:
+    """
+    Build the path of the events file for a city: country-code_city_name.json
     
-    return f"{event_type}_{location}_{date}"
+    Args:
+        country_code (str): Three-letter country code
+        city_name (str): Name of the city
+        
+    Returns:
+        str: Path to the city's events file
+    """
+    # Replace spaces with underscores and convert to lowercase
+    clean_city_name = city_name.replace(" ", "_").lower()
+    filename = f"{country_code.lower()}_{clean_city_name}.json"
+    return os.path.join(EXTRACTED_CITY_DATA_DIR, filename)
 
+def _file_signature(file_path: str) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist"""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _load_city_file(file_path: str) -> Tuple[List[Dict[str, Any]], Set[str]]:
+    """
+    Load the events stored in a city file along with the set of their IDs.
+    The parsed result is cached and reused until the file changes on disk.
+    
+    Args:
+        file_path (str): Path to the city's events file
+        
+    Returns:
+        tuple: (events, event_ids), or empty values if the file is missing or unreadable
+    """
+    signature = _file_signature(file_path)
+    if signature is None:
+        return [], set()
+    
+    cached = _city_file_cache.get(file_path)
+    if cached and cached[0] == signature:
+        return cached[1], cached[2]
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            events = json.load(f)
+    except Exception as e:
+        print(f"Error reading city data: {e}")
+        return [], set()
+    
+    event_ids = {event['id'] for event in events if 'id' in event}
+    _city_file_cache[file_path] = (signature, events, event_ids)
+    return events, event_ids
+
+def _load_city_date_index(file_path: str) -> Dict[str, Any]:
+    """
+    Load a city file as parallel columns of events and their parsed dates,
+    sorted by start date, so date filtering can bisect on the start dates and
+    compare date objects without touching the event dicts.
+    Events without a parseable start date are left out; a missing or invalid
+    end date falls back to the start date.
+    
+    Args:
+        file_path (str): Path to the city's events file
+        
+    Returns:
+        dict: Index with "events", "start_dates" and "end_dates" as parallel lists,
+              plus "min_start" and "max_end" (None when there are no dated events)
+    """
+    events, _ = _load_city_file(file_path)
+    
+    cached = _city_date_index_cache.get(file_path)
+    if cached and cached[0] is events:
+        return cached[1]
+    
+    rows = []
+    for position, event in enumerate(events):
+        start_date_obj = parse_date(event.get('start_date'))
+        if not start_date_obj:
+            continue
+        end_date_obj = parse_date(event.get('end_date')) or start_date_obj
+        rows.append((start_date_obj, position, end_date_obj, event))
+    
+    # Sort by start date, keeping file order for events on the same day
+    rows.sort(key=lambda row: row[:2])
+    
+    end_dates = [row[2] for row in rows]
+    index = {
+        "events": [row[3] for row in rows],
+        "start_dates": [row[0] for row in rows],
+        "end_dates": end_dates,
+        "min_start": rows[0][0] if rows else None,
+        "max_end": max(end_dates, default=None),
+    }
+    _city_date_index_cache[file_path] = (events, index)
+    return index
 
 def save_city_events(events: List[Dict[str, Any]], 
                      country_code: str, city_name: str) -> str:
@@ -71,49 +179,56 @@ def save_city_events(events: List[Dict[str, Any]],
     if not events:
         return None
         
-    # Create a clean filename: country-code_city_name.json
-    # Replace spaces with underscores and convert to lowercase
-    clean_city_name = city_name.replace(" ", "_").lower()
-    filename = f"{country_code.lower()}_{clean_city_name}.json"
-    file_path = os.path.join(EXTRACTED_CITY_DATA_DIR, filename)
-    
-    # Load existing events if the file exists
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                existing_events = json.load(f)
-        except Exception as e:
-            print(f"Error reading existing city data: {e}")
-            existing_events = []
-    else:
-        existing_events = []
+    file_path = get_city_file_path(country_code, city_name)
     
-    # Create a set of existing event IDs
-    existing_event_ids = {event['id'] for event in existing_events}
+    # Load existing events and their IDs (cached while the file is unchanged)
+    existing_events, existing_event_ids = _load_city_file(file_path)
     
-    # Add timestamps and IDs to new events, only if the ID is not already present
-    events_with_timestamp = []
+    # Add timestamps and IDs to new events, only if the ID is not already present.
+    # Keying by ID also collapses duplicates within this batch, keeping the
+    # first occurrence as the file does. All events in one save share the
+    # same timestamp.
+    created_at = datetime.now().isoformat()
+    new_events = {}
     for event in events:
-        event_copy = event.copy()
-        event_copy["created_at"] = datetime.now().isoformat()
-        
-        # Make sure the country code is included
-        if "country_code" not in event_copy:
-            event_copy["country_code"] = country_code
-            
-        # Generate a unique ID for the event
-        event_copy["id"] = get_event_id(event)
-        
-        # Append only if the ID is not in existing_event_ids
-        if event_copy["id"] not in existing_event_ids:
-            events_with_timestamp.append(event_copy)
+        event_id = get_event_id(event)
+        if event_id in existing_event_ids or event_id in new_events:
+            continue
+        new_events[event_id] = {
+            **event,
+            "created_at": created_at,
+            "country_code": event.get("country_code", country_code),
+            "id": event_id,
+        }
+    
+    # Nothing new to add, so leave the file as it is instead of rewriting it
+    if not new_events and os.path.exists(file_path):
+        return file_path
     
     # Combine existing and new events
-    combined_events = existing_events + events_with_timestamp
+    combined_events = existing_events + list(new_events.values())
+    
+    # Save to file (overwrite with combined data), serialising in memory first
+    # so the file is written with a single call instead of many small writes.
+    # Write to a temporary file and swap it in so a crash mid-write can never
+    # leave a truncated file that would read back as no events.
+    data = json.dumps(combined_events, indent=2)
+    # The temp name is unique per process and thread, since Streamlit sessions
+    # saving the same city run in separate threads
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        # Don't leave a stray temp file behind when the write fails
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
-    # Save to file (overwrite with combined data)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(combined_events, f, indent=2)
+    # Keep the cache in step with what was just written
+    combined_event_ids = existing_event_ids | new_events.keys()
+    _city_file_cache[file_path] = (_file_signature(file_path), combined_events, combined_event_ids)
     
     return file_path
 
@@ -130,11 +245,11 @@ def get_city_events(country_code: str, city_name: str,
         end_date (datetime.date or str): Filter events on or before this date (DD-MM-YYYY format)
         
     Returns:
-        list: List of event dictionaries, or empty list if file doesn't exist
+        list: List of event dictionaries, or empty list if file doesn't exist.
+              The dictionaries are copies, so changing them doesn't affect
+              the cached file contents.
     """
-    clean_city_name = city_name.replace(" ", "_").lower()
-    filename = f"{country_code.lower()}_{clean_city_name}.json"
-    file_path = os.path.join(EXTRACTED_CITY_DATA_DIR, filename)
+    file_path = get_city_file_path(country_code, city_name)
     
     # Convert string dates to date objects if needed
     if isinstance(start_date, str):
@@ -153,40 +268,36 @@ def get_city_events(country_code: str, city_name: str,
     else:
         end_date_obj = end_date
     
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                events = json.load(f)
-                filtered_events = []
-
-                for event in events:
-                    # Get event start and end dates
-                    event_start_date = event.get('start_date')
-                    event_end_date = event.get('end_date')
-                    
-                    if not event_start_date:
-                        continue
-
-                    # Parse dates using our standardized parser
-                    event_start_date_obj = parse_date(event_start_date)
-                    if not event_start_date_obj:
-                        continue
-                        
-                    event_end_date_obj = parse_date(event_end_date)
-                    if not event_end_date_obj:
-                        event_end_date_obj = event_start_date_obj
-
-                    # Check if event dates overlap with the search range
-                    if do_date_ranges_overlap(
-                        event_start_date_obj, event_end_date_obj,
-                        start_date_obj, end_date_obj
-                    ):
-                        filtered_events.append(event)
-
-                return filtered_events
-
-        except Exception as e:
-            print(f"Error reading city data: {e}")
-            return []
-    else:
+    index = _load_city_date_index(file_path)
+    
+    # Skip the scan when the whole file lies outside the search range
+    if not index["events"] or index["min_start"] > end_date_obj or index["max_end"] < start_date_obj:
         return []
+    
+    # Only events starting on or before the search end can overlap; bisect to
+    # that cut-off, then keep those that end on or after the search start
+    candidates = bisect_right(index["start_dates"], end_date_obj)
+    events, end_dates = index["events"], index["end_dates"]
+    return [dict(events[i]) for i in range(candidates) if end_dates[i] >= start_date_obj]
+
+def get_many_city_events(cities: List[Tuple[str, str]], 
+                         start_date: Union[str, datetime.date], 
+                         end_date: Union[str, datetime.date], 
+                         max_workers: int = 4) -> List[List[Dict[str, Any]]]:
+    """
+    Get saved events for several cities at once, reading their files in parallel.
+    
+    Args:
+        cities (list): List of (country_code, city_name) tuples
+        start_date (datetime.date or str): Filter events on or after this date (DD-MM-YYYY format)
+        end_date (datetime.date or str): Filter events on or before this date (DD-MM-YYYY format)
+        max_workers (int): Maximum number of parallel workers (default: 4)
+        
+    Returns:
+        list: One list of event dictionaries per city, in the same order as cities
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda city: get_city_events(city[0], city[1], start_date, end_date),
+            cities
+        ))
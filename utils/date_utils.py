@@ -3,10 +3,13 @@ Date handling utilities for standardized date operations across the application.
 Provides consistent parsing, formatting, and validation of dates and times.
 """
 
+import logging
 import re
 from datetime import datetime, date
-from dateutil import parser as date_parser
-from typing import Any, Dict, Optional, Tuple, Union
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
 
 
 # Date format constants
@@ -15,6 +18,56 @@ TIME_FORMAT_12H = "%I:%M %p"  # 12-hour time format with AM/PM: 10:30 PM
 TIME_FORMAT_24H = "%H:%M"  # 24-hour time format: 22:30
 DATETIME_ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"  # ISO format for timestamps
 
+# Known formats tried with strptime before falling back to dateutil's fuzzy parser.
+# Year-first dates are always read as year-month-day, whichever separator they
+# use and regardless of dayfirst.
+DAYFIRST_DATE_FORMATS = (DATE_FORMAT, "%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", DATETIME_ISO_FORMAT)
+MONTHFIRST_DATE_FORMATS = ("%m-%d-%Y", "%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", DATETIME_ISO_FORMAT)
+TIME_FORMATS = (TIME_FORMAT_12H, TIME_FORMAT_24H, "%I:%M%p", "%I %p", "%I:%M:%S %p", "%H:%M:%S")
+
+# Values already in the standard DATE_FORMAT / TIME_FORMAT_12H shape, which
+# validate_event_dates can keep without parsing and reformatting
+NORMALIZED_DATE_RE = re.compile(r'^(0[1-9]|[12]\d|3[01])-(0[1-9]|1[0-2])-\d{4}$')
+NORMALIZED_TIME_12H_RE = re.compile(r'^(0[1-9]|1[0-2]):[0-5]\d [AP]M$')
+
+# Placeholder values the model returns when a date or time is unknown
+NA_RE = re.compile(r'^\s*(n/?a|none|not\s+(available|specified))\s*$', re.IGNORECASE)
+
+# Cheap checks before fuzzy parsing: a date needs a digit, and a time also
+# needs a colon or an AM/PM marker. Strings like "TBD" or "evening" can't
+# parse, and dateutil is slowest on exactly that kind of input.
+DIGIT_RE = re.compile(r'\d')
+TIME_HINT_RE = re.compile(r':|(?<![a-z])[ap]\.?m\b', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1)
+def _get_date_parser():
+    """
+    Import dateutil's parser on first use. It is only needed for values the
+    known formats can't handle, so importing it up front only slows startup.
+    """
+    from dateutil import parser as date_parser
+    return date_parser
+
+
+def _strptime_first(value: str, formats: Tuple[str, ...]) -> Optional[datetime]:
+    """
+    Try each known format in turn with strptime.
+    
+    Args:
+        value: String to parse
+        formats: Formats to try, in order
+    
+    Returns:
+        A datetime object for the first format that matches, or None
+    """
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
 
 def parse_date(date_str: str, dayfirst: bool = True) -> Optional[date]:
     """
@@ -31,14 +84,70 @@ def parse_date(date_str: str, dayfirst: bool = True) -> Optional[date]:
     if not date_str:
         return None
         
+    # Handle 'N/A' or similar values
+    if isinstance(date_str, str) and NA_RE.match(date_str):
+        return None
+    
+    # Only strings are memoized; anything else goes straight to the parser
+    if isinstance(date_str, str):
+        return _parse_date_cached(date_str, dayfirst)
+    return _parse_date_uncached(date_str, dayfirst)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_str: str, dayfirst: bool) -> Optional[date]:
+    """Memoized parse_date for string inputs, since many events share the same dates"""
+    return _parse_date_uncached(date_str, dayfirst)
+
+
+def _parse_fixed_width_date(date_str: str, dayfirst: bool) -> Optional[date]:
+    """
+    Parse the common 10-character shapes by slicing, without strptime:
+    DD-MM-YYYY and DD/MM/YYYY (day first only), and YYYY-MM-DD and
+    YYYY/MM/DD. Gives the same result as the strptime formats it stands in for.
+    
+    Args:
+        date_str: Date string to parse
+        dayfirst: Whether DD-MM-YYYY shapes are day first
+    
+    Returns:
+        A date object, or None if the string isn't one of these shapes
+    """
+    if len(date_str) != 10:
+        return None
+    if dayfirst and date_str[2] == date_str[5] and date_str[2] in '-/':
+        day, month, year = date_str[0:2], date_str[3:5], date_str[6:10]
+    elif date_str[4] == date_str[7] and date_str[4] in '-/':
+        year, month, day = date_str[0:4], date_str[5:7], date_str[8:10]
+    else:
+        return None
+    # int() would also accept signs, spaces and underscores
+    if not (year + month + day).isdigit():
+        return None
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _parse_date_uncached(date_str: Any, dayfirst: bool) -> Optional[date]:
+    """Parse a date, trying the known formats before dateutil's fuzzy parser"""
     try:
-        # Handle 'N/A' or similar values
-        if isinstance(date_str, str) and date_str.lower() in ['n/a', 'na', 'none', 'not available', 'not specified']:
-            return None
+        # Try the known formats first; fuzzy parsing is only needed for free text
+        if isinstance(date_str, str):
+            parsed_date = _parse_fixed_width_date(date_str, dayfirst)
+            if parsed_date:
+                return parsed_date
+            parsed = _strptime_first(date_str, DAYFIRST_DATE_FORMATS if dayfirst else MONTHFIRST_DATE_FORMATS)
+            if parsed:
+                return parsed.date()
+            if not DIGIT_RE.search(date_str):
+                logger.debug("Error parsing date '%s': no digits", date_str)
+                return None
             
-        return date_parser.parse(date_str, fuzzy=True, dayfirst=dayfirst).date()
-    except (ValueError, TypeError) as e:
-        print(f"Error parsing date '{date_str}': {e}")
+        return _get_date_parser().parse(date_str, fuzzy=True, dayfirst=dayfirst).date()
+    except (ValueError, TypeError, OverflowError) as e:
+        logger.debug("Error parsing date '%s': %s", date_str, e)
         return None
 
 
@@ -55,14 +164,37 @@ def parse_time(time_str: str) -> Optional[datetime.time]:
     if not time_str:
         return None
         
+    # Handle 'N/A' or similar values
+    if isinstance(time_str, str) and NA_RE.match(time_str):
+        return None
+    
+    # Only strings are memoized; anything else goes straight to the parser
+    if isinstance(time_str, str):
+        return _parse_time_cached(time_str)
+    return _parse_time_uncached(time_str)
+
+
+@lru_cache(maxsize=4096)
+def _parse_time_cached(time_str: str) -> Optional[datetime.time]:
+    """Memoized parse_time for string inputs, since many events share the same times"""
+    return _parse_time_uncached(time_str)
+
+
+def _parse_time_uncached(time_str: Any) -> Optional[datetime.time]:
+    """Parse a time, trying the known formats before dateutil's fuzzy parser"""
     try:
-        # Handle 'N/A' or similar values
-        if isinstance(time_str, str) and time_str.lower() in ['n/a', 'na', 'none', 'not available', 'not specified']:
-            return None
+        # Try the known formats first; fuzzy parsing is only needed for free text
+        if isinstance(time_str, str):
+            parsed = _strptime_first(time_str.strip(), TIME_FORMATS)
+            if parsed:
+                return parsed.time()
+            if not DIGIT_RE.search(time_str) or not TIME_HINT_RE.search(time_str):
+                logger.debug("Error parsing time '%s': no time-like value", time_str)
+                return None
             
-        return date_parser.parse(time_str, fuzzy=True).time()
-    except (ValueError, TypeError) as e:
-        print(f"Error parsing time '{time_str}': {e}")
+        return _get_date_parser().parse(time_str, fuzzy=True).time()
+    except (ValueError, TypeError, OverflowError) as e:
+        logger.debug("Error parsing time '%s': %s", time_str, e)
         return None
 
 
@@ -78,8 +210,11 @@ def format_date(date_obj: Optional[Union[date, datetime]]) -> str:
     """
     if not date_obj:
         return ""
-        
-    return date_obj.strftime(DATE_FORMAT)
+    
+    # Cache on the plain date so datetimes on the same day share an entry
+    if isinstance(date_obj, datetime):
+        date_obj = date_obj.date()
+    return _format_date_cached(date_obj)
 
 
 def format_time_12h(time_obj: Optional[Union[datetime.time, datetime]]) -> str:
@@ -94,8 +229,10 @@ def format_time_12h(time_obj: Optional[Union[datetime.time, datetime]]) -> str:
     """
     if not time_obj:
         return ""
-        
-    return time_obj.strftime(TIME_FORMAT_12H)
+    
+    if isinstance(time_obj, datetime):
+        time_obj = time_obj.time()
+    return _format_time_12h_cached(time_obj)
 
 
 def format_time_24h(time_obj: Optional[Union[datetime.time, datetime]]) -> str:
@@ -110,7 +247,27 @@ def format_time_24h(time_obj: Optional[Union[datetime.time, datetime]]) -> str:
     """
     if not time_obj:
         return ""
-        
+    
+    if isinstance(time_obj, datetime):
+        time_obj = time_obj.time()
+    return _format_time_24h_cached(time_obj)
+
+
+@lru_cache(maxsize=1024)
+def _format_date_cached(date_obj: date) -> str:
+    """Memoized strftime for format_date, since many events fall on the same day"""
+    return date_obj.strftime(DATE_FORMAT)
+
+
+@lru_cache(maxsize=1024)
+def _format_time_12h_cached(time_obj: datetime.time) -> str:
+    """Memoized strftime for format_time_12h"""
+    return time_obj.strftime(TIME_FORMAT_12H)
+
+
+@lru_cache(maxsize=1024)
+def _format_time_24h_cached(time_obj: datetime.time) -> str:
+    """Memoized strftime for format_time_24h"""
     return time_obj.strftime(TIME_FORMAT_24H)
 
 
@@ -160,44 +317,54 @@ def validate_event_dates(event: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Event dictionary with standardized date fields
     """
-    # Process start_date
-    if event.get("start_date"):
+    # Process start_date, keeping values already in the standard format
+    if event.get("start_date") and not NORMALIZED_DATE_RE.match(event["start_date"]):
         start_date_obj = parse_date(event["start_date"])
         if start_date_obj:
             event["start_date"] = format_date(start_date_obj)
     
     # Process end_date
     if event.get("end_date"):
-        end_date_obj = parse_date(event["end_date"])
-        if end_date_obj:
-            event["end_date"] = format_date(end_date_obj)
+        if not NORMALIZED_DATE_RE.match(event["end_date"]):
+            end_date_obj = parse_date(event["end_date"])
+            if end_date_obj:
+                event["end_date"] = format_date(end_date_obj)
     elif event.get("start_date"):
         # If no end_date but start_date exists, set end_date = start_date
         event["end_date"] = event["start_date"]
     
-    # Process start_time
+    # Process start_time, keeping values already in the standard format
     if event.get("start_time"):
-        start_time_obj = parse_time(event["start_time"])
-        if start_time_obj:
-            event["start_time"] = format_time_12h(start_time_obj)
-        else:
-            event["start_time"] = "12:00 AM"  # Default start time
+        if not NORMALIZED_TIME_12H_RE.match(event["start_time"]):
+            start_time_obj = parse_time(event["start_time"])
+            if start_time_obj:
+                event["start_time"] = format_time_12h(start_time_obj)
+            else:
+                event["start_time"] = "12:00 AM"  # Default start time
     else:
         event["start_time"] = "12:00 AM"  # Default start time
     
     # Process end_time
     if event.get("end_time"):
-        end_time_obj = parse_time(event["end_time"])
-        if end_time_obj:
-            event["end_time"] = format_time_12h(end_time_obj)
-        else:
-            event["end_time"] = "11:59 PM"  # Default end time
+        if not NORMALIZED_TIME_12H_RE.match(event["end_time"]):
+            end_time_obj = parse_time(event["end_time"])
+            if end_time_obj:
+                event["end_time"] = format_time_12h(end_time_obj)
+            else:
+                event["end_time"] = "11:59 PM"  # Default end time
     else:
         event["end_time"] = "11:59 PM"  # Default end time
     
     return event
 
 
+def _coerce_date(value: Union[str, date]) -> Optional[date]:
+    """Parse a date string, or pass a date object through unchanged"""
+    if isinstance(value, str):
+        return parse_date(value)
+    return value
+
+
 def is_date_in_range(date_to_check: Union[str, date], 
                     start_date: Union[str, date], 
                     end_date: Union[str, date]) -> bool:
@@ -212,29 +379,12 @@ def is_date_in_range(date_to_check: Union[str, date],
     Returns:
         True if date is in range, False otherwise
     """
-    # Parse date strings if needed
-    if isinstance(date_to_check, str):
-        date_to_check_obj = parse_date(date_to_check)
-        if not date_to_check_obj:
-            return False
-    else:
-        date_to_check_obj = date_to_check
-    
-    if isinstance(start_date, str):
-        start_date_obj = parse_date(start_date)
-        if not start_date_obj:
-            return False
-    else:
-        start_date_obj = start_date
-    
-    if isinstance(end_date, str):
-        end_date_obj = parse_date(end_date)
-        if not end_date_obj:
-            return False
-    else:
-        end_date_obj = end_date
+    date_to_check_obj = _coerce_date(date_to_check)
+    start_date_obj = _coerce_date(start_date)
+    end_date_obj = _coerce_date(end_date)
+    if not date_to_check_obj or not start_date_obj or not end_date_obj:
+        return False
     
-    # Check if date is in range
     return start_date_obj <= date_to_check_obj <= end_date_obj
 
 
@@ -254,34 +404,54 @@ def do_date_ranges_overlap(range1_start: Union[str, date],
     Returns:
         True if ranges overlap, False otherwise
     """
-    # Parse date strings if needed
-    if isinstance(range1_start, str):
-        range1_start_obj = parse_date(range1_start)
-        if not range1_start_obj:
-            return False
-    else:
-        range1_start_obj = range1_start
+    range1_start_obj = _coerce_date(range1_start)
+    range1_end_obj = _coerce_date(range1_end)
+    range2_start_obj = _coerce_date(range2_start)
+    range2_end_obj = _coerce_date(range2_end)
+    if not range1_start_obj or not range1_end_obj or not range2_start_obj or not range2_end_obj:
+        return False
     
-    if isinstance(range1_end, str):
-        range1_end_obj = parse_date(range1_end)
-        if not range1_end_obj:
-            return False
-    else:
-        range1_end_obj = range1_end
+    # Ranges overlap if one range doesn't entirely come before or after the other
+    return not (range1_end_obj < range2_start_obj or range1_start_obj > range2_end_obj)
+
+
+def make_range_predicate(start_date: Union[str, date], 
+                         end_date: Union[str, date]) -> Callable[..., bool]:
+    """
+    Build a check against a fixed date range (inclusive), parsing the bounds
+    once so callers filtering many events against the same range only pay
+    for comparisons.
     
-    if isinstance(range2_start, str):
-        range2_start_obj = parse_date(range2_start)
-        if not range2_start_obj:
-            return False
-    else:
-        range2_start_obj = range2_start
+    The returned function takes a date, or a start and end date, and returns
+    True if the date is in the range or the two ranges overlap. Unparseable
+    dates, including unparseable bounds, never match.
+    
+    Args:
+        start_date: Start date of range
+        end_date: End date of range
+    
+    Returns:
+        A function check(date_start, date_end=None) -> bool
+    """
+    start_date_obj = _coerce_date(start_date)
+    end_date_obj = _coerce_date(end_date)
     
-    if isinstance(range2_end, str):
-        range2_end_obj = parse_date(range2_end)
-        if not range2_end_obj:
+    def check(date_start: Union[str, date], date_end: Optional[Union[str, date]] = None) -> bool:
+        if not start_date_obj or not end_date_obj:
             return False
-    else:
-        range2_end_obj = range2_end
+        
+        date_start_obj = _coerce_date(date_start)
+        if not date_start_obj:
+            return False
+        
+        if date_end is None:
+            date_end_obj = date_start_obj
+        else:
+            date_end_obj = _coerce_date(date_end)
+            if not date_end_obj:
+                return False
+        
+        # Ranges overlap if one range doesn't entirely come before or after the other
+        return not (date_end_obj < start_date_obj or date_start_obj > end_date_obj)
     
-    # Ranges overlap if one range doesn't entirely come before or after the other
-    return not (range1_end_obj < range2_start_obj or range1_start_obj > range2_end_obj) 
\ No newline at end of file
+    return check
@@ -1,23 +1,41 @@
 import json
+import logging
 import os
-from typing import Any, Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
 import streamlit as st
-from openai import OpenAI
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 from utils.date_utils import (
     parse_date, format_date, 
-    do_date_ranges_overlap, validate_event_dates
+    make_range_predicate, validate_event_dates
 )
+from utils.llm_cache import cached_responses_create, get_cache_dir
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+@st.cache_resource(show_spinner=False)
+def _get_cached_openai_client(api_key: str) -> "OpenAI":
+    """One OpenAI client per API key, shared across reruns and threads"""
+    # Imported here so the app can render before the openai package is loaded
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
 
 # Initialize the OpenAI client with API key from session state
 def get_openai_client():
     if st.session_state.openai_api_key:
-        return OpenAI(api_key=st.session_state.openai_api_key)
+        return _get_cached_openai_client(st.session_state.openai_api_key)
     else:
         return None
 
-def validate_event_date(event: Dict[str, Any], search_start_date: str, search_end_date: str) -> Dict[str, Any]:
+def validate_event_date(event: Dict[str, Any], search_start_date: str, search_end_date: str,
+                        in_search_range: Optional[Callable[..., bool]] = None) -> Dict[str, Any]:
     """
     Validates the start_date and end_date of an event and sets defaults if invalid.
     Also filters out events that don't overlap with the search date range.
@@ -26,6 +44,8 @@ def validate_event_date(event: Dict[str, Any], search_start_date: str, search_en
         event: Event dictionary containing event details
         search_start_date: Start date of the search range (DD-MM-YYYY or date object)
         search_end_date: End date of the search range (DD-MM-YYYY or date object)
+        in_search_range: Check built by make_range_predicate for the search range,
+            so callers validating many events parse the range once (built here if omitted)
         
     Returns:
         The event dictionary with validated date fields or empty dict if invalid or outside search range
@@ -37,12 +57,12 @@ def validate_event_date(event: Dict[str, Any], search_start_date: str, search_en
         
         # Get event date objects
         if not event.get("start_date"):
-            print(f"No start_date provided for event: {event}")
+            logger.debug("No start_date provided for event: %s", event)
             return {}
             
         start_date_obj = parse_date(event["start_date"])
         if not start_date_obj:
-            print(f"Invalid start_date: {event['start_date']}")
+            logger.debug("Invalid start_date: %s", event['start_date'])
             return {}
             
         end_date_obj = parse_date(event["end_date"])
@@ -53,35 +73,20 @@ def validate_event_date(event: Dict[str, Any], search_start_date: str, search_en
         
         # Check if end date is before start date (invalid)
         if end_date_obj < start_date_obj:
-            print(f"Invalid date range: end date {end_date_obj} is before start date {start_date_obj}")
+            logger.debug("Invalid date range: end date %s is before start date %s", end_date_obj, start_date_obj)
             return {}
         
-        # Convert search dates to date objects if they are strings
-        search_start_date_obj = search_start_date
-        if isinstance(search_start_date, str):
-            search_start_date_obj = parse_date(search_start_date)
-            if not search_start_date_obj:
-                return {}
-        
-        search_end_date_obj = search_end_date
-        if isinstance(search_end_date, str):
-            search_end_date_obj = parse_date(search_end_date)
-            if not search_end_date_obj:
-                return {}
+        if in_search_range is None:
+            in_search_range = make_range_predicate(search_start_date, search_end_date)
         
-        # Debug log the actual dates being compared 
-        print(f"Comparing event ({start_date_obj} to {end_date_obj}) with search range ({search_start_date_obj} to {search_end_date_obj})")
-        
-        # Check if event overlaps with search date range
-        if not do_date_ranges_overlap(
-            start_date_obj, end_date_obj,
-            search_start_date_obj, search_end_date_obj
-        ):
-            print(f"Event date range ({start_date_obj} to {end_date_obj}) doesn't overlap with search range ({search_start_date_obj} to {search_end_date_obj})")
+        # Check if event overlaps with search date range (an unparseable
+        # search range matches nothing)
+        if not in_search_range(start_date_obj, end_date_obj):
+            logger.debug("Event date range (%s to %s) doesn't overlap with search range (%s to %s)", start_date_obj, end_date_obj, search_start_date, search_end_date)
             return {}
             
-    except Exception as e:
-        print(f"Error validating event date: {e}")
+    except (ValueError, TypeError, OverflowError):
+        logger.exception("Error validating event date")
         return {}
     
     return event
@@ -134,12 +139,23 @@ text_format = {
                     }
                 }
 
-def get_prompt(city: str, country: str, event_type: str,  start_date: str,  end_date: str) -> str:
-    """
-    Generate a prompt for finding traffic events in a specific city and country.
-    """
-    prompt = f"""You are a helpful assistant that finds {event_type} events information from internet and returns it in a structured JSON format. 
-        Find {event_type} events in {city} {country} between {start_date} and {end_date}.
+# Search ranges up to this many days start with "medium" search context
+SHORT_RANGE_DAYS = 14
+
+# Web search tool settings; _search_events fills in the context size and the
+# user's location
+WEB_SEARCH_TOOL = {
+    "type": "web_search_preview",
+    "search_context_size": "high",
+    "user_location": {
+        "type": "approximate"
+    }
+}
+
+# Instructions shared by every search. They come first in the prompt so that
+# consecutive searches share the same prefix for OpenAI's prompt caching; the
+# per-search details are appended by get_prompt.
+PROMPT_PREFIX = """You are a helpful assistant that finds events information from internet and returns it in a structured JSON format. 
 
         Extract following details for each event: 
         - Event type (e.g., concert, sport event, road closure, construction, festival, public protest) 
@@ -153,51 +169,43 @@ def get_prompt(city: str, country: str, event_type: str,  start_date: str,  end_
         - Source (the specific web page or article where the information is found) 
         If the start time is not specified and the event is likely to occur in the evening (e.g., concerts, live shows,festivals), assume a start time of 18:00. 
         IMPORTANT: Start Date is very important, so make sure to always include it for every event.
+"""
+
+@lru_cache(maxsize=128)
+def get_prompt(city: str, country: str, event_type: str,  start_date: str,  end_date: str) -> str:
+    """
+    Generate a prompt for finding traffic events in a specific city and country.
+    """
+    prompt = PROMPT_PREFIX + f"""
+        Find {event_type} events in {city} {country} between {start_date} and {end_date}.
     """
     return prompt
 
-def find_traffic_events(city: str, country: str,
-                        start_date, end_date, event_type: str) -> List[Dict[str, Any]]:
+def _is_valid_json(text: str) -> bool:
+    """Whether a response text parses as JSON (an empty response counts as no events)"""
+    if not text:
+        return True
+    try:
+        json.loads(text)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+def _search_events(client: "OpenAI", city: str, country: str, event_type: str,
+                   start_date: str, end_date: str, search_context_size: str) -> Optional[List[Dict[str, Any]]]:
     """
-    Find events that could affect road traffic in the specified city using OpenAI with web search.
+    Run the web search for one event type and parse the events from the
+    response, retrying with the parse error as feedback if the JSON is invalid.
     
-    Args:
-        city: Name of the city to search for events
-        country: Country code for localization
-        start_date: start date for custom date range (in DD-MM-YYYY format or date object)
-        end_date: end date for custom date range (in DD-MM-YYYY format or date object)
-        
     Returns:
-        List of structured event dictionaries
+        List of raw event dictionaries, or None if the API call failed
+        (the error has already been shown to the user)
     """
-    # Convert dates to strings in our standard format
-    if hasattr(start_date, 'strftime'):
-        start_date = format_date(start_date)
-    
-    if hasattr(end_date, 'strftime'):
-        end_date = format_date(end_date)
-        
-    # Get OpenAI client using API key from session state
-    client = get_openai_client()
-    
-    # Check if API key is provided
-    if not client:
-        st.error("Please enter your OpenAI API key in the sidebar to search for events.")
-        return []
-    
-    # Check if API key format is valid (simple check)
-    if not st.session_state.openai_api_key.startswith("sk-"):
-        st.warning("The OpenAI API key format doesn't look valid. It should start with 'sk-'.")
-
     tools = [
         {
-            "type": "web_search_preview",
-            "search_context_size": "high",
-            "user_location": {
-                "type": "approximate",
-                "country": country,
-                "city": city
-            }
+            **WEB_SEARCH_TOOL,
+            "search_context_size": search_context_size,
+            "user_location": {**WEB_SEARCH_TOOL["user_location"], "country": country, "city": city}
         }
     ]
 
@@ -206,50 +214,74 @@ def find_traffic_events(city: str, country: str,
     attempt = 0
     events = []
     
+    # Conversation sent to the model; failed attempts add their output and
+    # the parse error so the retry can correct itself
+    input_messages = [
+        {
+            "role": "user",
+            "content": get_prompt(city, country, event_type, start_date, end_date)
+        }
+    ]
+    
     while attempt < max_retries:
         attempt += 1
         
         try:
             if attempt > 1:
-                print(f"Retry attempt {attempt}/{max_retries} for event type: {event_type}")
+                logger.info("Retry attempt %d/%d for event type: %s", attempt, max_retries, event_type)
                 st.info(f"Retrying search attempt {attempt}/{max_retries} for {event_type}...")
+                # Back off a little more before each retry
+                time.sleep(1.0 * (attempt - 1))
                 
-            response = client.responses.create(
+            response = cached_responses_create(
+                client,
+                get_cache_dir(),
+                ["gpt-4o", input_messages, tools, text_format],
+                refresh=attempt > 1,
+                # Only cache parseable output, so a bad response is never replayed
+                is_valid=_is_valid_json,
                 model="gpt-4o",
-                input = [
-                    {
-                        "role": "user",
-                        "content": get_prompt(city, country, event_type, start_date, end_date)
-                    }
-                ],
+                input=input_messages,
                 tools=tools,
                 tool_choice={"type": "web_search_preview"},
                 text=text_format
             )
 
+            # Report how much of the prompt was served from OpenAI's prompt cache
+            # (usage is missing when the response came from the local cache)
+            usage = getattr(response, "usage", None)
+            input_details = getattr(usage, "input_tokens_details", None)
+            if input_details is not None:
+                logger.debug("Prompt tokens: %s, cached: %s", usage.input_tokens, input_details.cached_tokens)
+
             # Parse the response - field name changes with new endpoint
             events_json = response.output_text
-            print(f"--------------------------------    ")
-            print(f"Events JSON: {events_json}")
-            print(f"--------------------------------")
+            logger.debug("Events JSON: %s", events_json)
             try:
                 events_data = json.loads(events_json) if events_json else {"events": []}
                 events = events_data.get("events", []) if events_data else []
-                print(f"Found {len(events)} events for event type: {event_type}")
+                logger.debug("Found %d events for event type: %s", len(events), event_type)
                 # JSON parsing succeeded, break out of the retry loop
                 break
             except json.JSONDecodeError as json_err:
-                print(f"Error parsing JSON response for event type: {event_type}. Error: {json_err}")
+                logger.warning("Error parsing JSON response for event type: %s. Error: %s", event_type, json_err)
                 if attempt < max_retries:
-                    print(f"Will retry, {max_retries - attempt} attempts remaining")
+                    logger.info("Will retry, %d attempts remaining", max_retries - attempt)
+                    input_messages = input_messages + [
+                        {"role": "assistant", "content": events_json},
+                        {
+                            "role": "user",
+                            "content": f"Your previous output failed JSON parsing with error: {json_err}. Return strictly valid JSON matching the schema."
+                        }
+                    ]
                     continue
                 else:
-                    print(f"Maximum retry attempts reached. Unable to parse JSON response.")
+                    logger.warning("Maximum retry attempts reached. Unable to parse JSON response.")
                     events = []
                     break
 
         except Exception as e:
-            print(f"Error finding traffic events: {e} for event type: {event_type}")
+            logger.exception("Error finding traffic events for event type: %s", event_type)
             error_message = str(e).lower()
             
             # Check for authentication/API key errors
@@ -259,10 +291,127 @@ def find_traffic_events(city: str, country: str,
                 st.error(f"OpenAI API usage limit reached: Your account may be out of credits or has exceeded its quota.")
             else:
                 st.error(f"Error finding traffic events: {e}")
-            return []
+            return None
+
+    return events
 
-    events = [validate_event_time(event) for event in events]
-    events = [validate_event_date(event, start_date, end_date) for event in events]
-    events = [event for event in events if event]
+
+def find_traffic_events(city: str, country: str,
+                        start_date, end_date, event_type: str) -> List[Dict[str, Any]]:
+    """
+    Find events that could affect road traffic in the specified city using OpenAI with web search.
+    
+    Args:
+        city: Name of the city to search for events
+        country: Country code for localization
+        start_date: start date for custom date range (in DD-MM-YYYY format or date object)
+        end_date: end date for custom date range (in DD-MM-YYYY format or date object)
+        
+    Returns:
+        List of structured event dictionaries
+    """
+    # Convert dates to strings in our standard format
+    if hasattr(start_date, 'strftime'):
+        start_date = format_date(start_date)
+    
+    if hasattr(end_date, 'strftime'):
+        end_date = format_date(end_date)
+    
+    # Parse the search range once for all events
+    search_start_date = parse_date(start_date)
+    search_end_date = parse_date(end_date)
+    if not search_start_date or not search_end_date:
+        logger.warning("Invalid search range: %s to %s", start_date, end_date)
+        return []
+        
+    # Get OpenAI client using API key from session state
+    client = get_openai_client()
+    
+    # Check if API key is provided
+    if not client:
+        st.error("Please enter your OpenAI API key in the sidebar to search for events.")
+        return []
+    
+    # Check if API key format is valid (simple check)
+    if not st.session_state.openai_api_key.startswith("sk-"):
+        st.warning("The OpenAI API key format doesn't look valid. It should start with 'sk-'.")
+
+    # Short ranges usually need less search context, which is faster and
+    # cheaper; fall back to the full context if that finds nothing
+    if (search_end_date - search_start_date).days <= SHORT_RANGE_DAYS:
+        search_context_sizes = ["medium", "high"]
+    else:
+        search_context_sizes = ["high"]
+    
+    for search_context_size in search_context_sizes:
+        events = _search_events(client, city, country, event_type, start_date, end_date, search_context_size)
+        if events is None:
+            return []
+        if events:
+            break
+        logger.info("No events for event type %s with %s search context", event_type, search_context_size)
+    
+    # validate_event_date also normalizes the times (both go through
+    # validate_event_dates), so one pass validates and filters each event
+    # against a range check built once
+    in_search_range = make_range_predicate(search_start_date, search_end_date)
+    events = [
+        validated for event in events
+        if (validated := validate_event_date(event, search_start_date, search_end_date, in_search_range))
+    ]
     
     return events
+
+
+def dedup_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Remove repeated events, e.g. a festival found under more than one event
+    type. Events are the same if they share name, start date and location;
+    the first occurrence is kept.
+    
+    Args:
+        events: List of event dictionaries
+        
+    Returns:
+        List of unique events, in their original order
+    """
+    seen = set()
+    unique_events = []
+    for event in events:
+        key = (event.get("event_name"), event.get("start_date"), event.get("location"))
+        if key not in seen:
+            seen.add(key)
+            unique_events.append(event)
+    return unique_events
+
+
+def find_traffic_events_batch(city: str, country: str, start_date, end_date,
+                              event_types: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Find traffic events for several event types at once, running the
+    searches in parallel since each one mostly waits on the OpenAI API.
+    
+    Args:
+        city: Name of the city to search for events
+        country: Country code for localization
+        start_date: start date for custom date range (in DD-MM-YYYY format or date object)
+        end_date: end date for custom date range (in DD-MM-YYYY format or date object)
+        event_types: Event types to search for
+        
+    Returns:
+        Dictionary mapping each event type to its list of structured events,
+        in the same order as event_types
+    """
+    if not event_types:
+        return {}
+    
+    # Worker threads need the script run context to use session state and
+    # show messages in the app
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=min(8, len(event_types)),
+                            initializer=add_script_run_ctx, initargs=(None, ctx)) as executor:
+        results = executor.map(
+            lambda event_type: find_traffic_events(city, country, start_date, end_date, event_type),
+            event_types
+        )
+        return dict(zip(event_types, results))
@@ -1,13 +1,54 @@
+import logging
 import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import closing
+from functools import lru_cache
 from math import asin, cos, radians, sin, sqrt
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
-import googlemaps
 import streamlit as st
 
-# Initialize Google Maps client with API key from environment
-gmaps = googlemaps.Client(key=st.secrets["GEOCODE_API"])
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def get_gmaps_client():
+    """
+    Create the Google Maps client on first use, with the API key from secrets.
+    Lookups served from the geocode cache never need it, so it isn't built
+    (and googlemaps isn't imported) until an address actually goes to the API.
+    
+    The client rate-limits itself; cap it at the Geocoding API's 50 requests
+    per second so parallel lookups are throttled locally instead of being
+    rejected over quota. Give up retrying a lookup after 10 seconds rather
+    than the default minute, so one failing address doesn't hold up the rest
+    of the events.
+    """
+    import googlemaps
+    return googlemaps.Client(
+        key=st.secrets["GEOCODE_API"], queries_per_second=50, retry_timeout=10
+    )
+
+# Geocoding results are cached on disk so repeated venues skip the API across
+# sessions. Only successful lookups are stored, and entries expire after a week.
+GEOCODE_CACHE_PATH = os.path.join("data", "geocode_cache.sqlite3")
+GEOCODE_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Cache rows already read or written in this process, keyed by normalized
+# address, as (lat, lng, created_at), so repeat lookups skip sqlite too
+_geocode_memory_cache: Dict[str, Tuple[float, float, float]] = {}
+
+# Open cache connection per thread (sqlite connections can't be shared across
+# threads), reused so a memory miss only costs the query
+_geocode_cache_local = threading.local()
+
+WHITESPACE_RE = re.compile(r'\s+')
+# Unicode combining mark blocks (accents left over after NFD decomposition)
+COMBINING_MARKS_RE = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]+')
 
 def geo_tag_events(events, city, country_code, 
                    max_distance_km=100, max_workers=4):
@@ -23,47 +64,55 @@ def geo_tag_events(events, city, country_code,
     Returns:
         List of events with geographic coordinates, filtered by distance
     """
-    tagged_events = []
-    
     city_coordinates = fetch_lat_long(f"{city}, {country_code}")
     
-    def process_event(event):
-        event_copy = event.copy()
-        if "location" in event_copy and event_copy["location"]:
-            city = event_copy.get("city_name", "")
-            country_code = event_copy.get("country_code", "")
-            full_location = format_full_location(event_copy["location"], city, country_code)
-            coordinates = fetch_lat_long(full_location)
-
-            event_copy["latitude"] = coordinates[0]
-            event_copy["longitude"] = coordinates[1]
+    # Convert the city center to radians once instead of for every event
+    city_center = None
+    if city_coordinates[0] and city_coordinates[1]:
+        city_center = prepare_city_center(*city_coordinates)
+    
+    # Events at the same venue share a location string, so geocode each
+    # distinct location once (in parallel) and look the result up per event
+    full_locations = [
+        format_full_location(event["location"], event.get("city_name", ""), event.get("country_code", ""))
+        if event.get("location") else None
+        for event in events
+    ]
+    unique_locations = list(dict.fromkeys(loc for loc in full_locations if loc))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        coordinates = dict(zip(unique_locations, executor.map(fetch_lat_long, unique_locations)))
+    
+    def process_event(event, full_location):
+        if not full_location:
+            return None
+        
+        latitude, longitude = coordinates[full_location]
+        
+        # Skip events with invalid coordinates
+        if not latitude or not longitude:
+            return None
+        
+        # Build the tagged event only once it has valid coordinates
+        tagged_event = {**event, "latitude": latitude, "longitude": longitude}
+            
+        # Skip events that are too far from the city center
+        if city_center:
+            distance = distance_from_city_center(city_center, latitude, longitude)
             
-            # Skip events with invalid coordinates
-            if not coordinates[0] or not coordinates[1]:
+            if distance > max_distance_km:
                 return None
+            
+            tagged_event["distance_from_city_km"] = distance
                 
-            # Skip events that are too far from the city center
-            if city_coordinates[0] and city_coordinates[1]:
-                distance = haversine_distance(
-                    city_coordinates[0], city_coordinates[1],
-                    coordinates[0], coordinates[1]
-                )
-                
-                event_copy["distance_from_city_km"] = distance
-                
-                if distance > max_distance_km:
-                    return None
-                    
-            # Event passes all filters
-            return event_copy
-        return None
-    
-    # Process events in parallel using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = list(executor.map(process_event, events))
+        # Event passes all filters
+        return tagged_event
     
-    # Filter out None results
-    tagged_events = [event for event in results if event is not None]
+    # Filter out events that were dropped
+    tagged_events = [
+        tagged_event
+        for event, full_location in zip(events, full_locations)
+        if (tagged_event := process_event(event, full_location)) is not None
+    ]
     
     return tagged_events
 
@@ -86,10 +135,136 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     r = 6371  # Radius of earth in kilometers
     return c * r
 
+def prepare_city_center(lat, lon):
+    """
+    Precompute the values haversine_distance derives from a fixed point, so
+    distances from it can be computed with fewer trig calls.
+    
+    Returns:
+        Tuple of (latitude in radians, longitude in radians, cosine of latitude)
+    """
+    lat_rad = radians(lat)
+    return lat_rad, radians(lon), cos(lat_rad)
+
+def distance_from_city_center(city_center, lat, lon):
+    """
+    Great circle distance from a city center prepared by prepare_city_center
+    to a point in decimal degrees. Same result as haversine_distance.
+    
+    Returns:
+        Distance in kilometers
+    """
+    city_lat_rad, city_lon_rad, city_cos_lat = city_center
+    lat_rad = radians(lat)
+    dlon = radians(lon) - city_lon_rad
+    dlat = lat_rad - city_lat_rad
+    a = sin(dlat/2)**2 + city_cos_lat * cos(lat_rad) * sin(dlon/2)**2
+    return 2 * 6371 * asin(sqrt(a))
+
 def format_full_location(location, city, country_code):
     """Format a complete location string using location, city and country code"""
-    parts = [p for p in [location, city, country_code] if p]
-    return ", ".join(parts)
+    return ", ".join(filter(None, (location, city, country_code)))
+
+@lru_cache(maxsize=None)
+def _init_geocode_cache(path: str) -> None:
+    """
+    Create the geocode cache directory and table once per database path.
+    Failures aren't cached, and _reset_geocode_cache clears this after a
+    cache error so the next lookup sets the database up again.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with closing(sqlite3.connect(path, timeout=10)) as conn, conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            "address TEXT PRIMARY KEY, lat REAL NOT NULL, lng REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+
+def _get_geocode_cache_connection() -> sqlite3.Connection:
+    """Get this thread's geocode cache connection, opening it on first use"""
+    _init_geocode_cache(GEOCODE_CACHE_PATH)
+    if getattr(_geocode_cache_local, "path", None) != GEOCODE_CACHE_PATH:
+        _geocode_cache_local.conn = sqlite3.connect(GEOCODE_CACHE_PATH, timeout=10)
+        _geocode_cache_local.path = GEOCODE_CACHE_PATH
+    return _geocode_cache_local.conn
+
+def _reset_geocode_cache() -> None:
+    """Drop this thread's connection and the setup after a cache error"""
+    conn = getattr(_geocode_cache_local, "conn", None)
+    if conn is not None:
+        conn.close()
+    _geocode_cache_local.conn = _geocode_cache_local.path = None
+    _init_geocode_cache.cache_clear()
+
+def normalize_address(address: str) -> str:
+    """
+    Normalize an address for cache lookups: Unicode NFD form with accents
+    removed, lowercase, and runs of whitespace collapsed to single spaces.
+    
+    Args:
+        address: The address to normalize
+        
+    Returns:
+        The normalized address
+    """
+    decomposed = COMBINING_MARKS_RE.sub('', unicodedata.normalize('NFD', address))
+    return WHITESPACE_RE.sub(' ', decomposed.lower()).strip()
+
+@lru_cache(maxsize=4096)
+def _geocode_cache_key(address: str) -> str:
+    """Normalized cache key for a raw address, memoized so repeats skip normalization"""
+    return normalize_address(address)
+
+def get_cached_lat_long(address: str) -> Optional[Tuple[float, float]]:
+    """
+    Look up an address in the geocode cache.
+    
+    Args:
+        address: The address to look up
+        
+    Returns:
+        Tuple of (latitude, longitude), or None if not cached or expired
+    """
+    key = _geocode_cache_key(address)
+    row = _geocode_memory_cache.get(key)
+    if row is None:
+        try:
+            row = _get_geocode_cache_connection().execute(
+                "SELECT lat, lng, created_at FROM geocode WHERE address = ?",
+                (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Geocode cache lookup failed: %s", e)
+            _reset_geocode_cache()
+            return None
+        if row:
+            _geocode_memory_cache[key] = row
+    
+    if row and time.time() - row[2] < GEOCODE_CACHE_TTL_SECONDS:
+        return row[0], row[1]
+    return None
+
+def cache_lat_long(address: str, latitude: float, longitude: float) -> None:
+    """
+    Store the coordinates of an address in the geocode cache.
+    
+    Args:
+        address: The geocoded address
+        latitude: Latitude of the address
+        longitude: Longitude of the address
+    """
+    row = (latitude, longitude, time.time())
+    key = _geocode_cache_key(address)
+    _geocode_memory_cache[key] = row
+    try:
+        conn = _get_geocode_cache_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode (address, lat, lng, created_at) VALUES (?, ?, ?, ?)",
+                (key, *row)
+            )
+    except sqlite3.Error as e:
+        logger.warning("Geocode cache update failed: %s", e)
+        _reset_geocode_cache()
 
 def fetch_lat_long(
     address: str
@@ -103,16 +278,21 @@ def fetch_lat_long(
     Returns:
         Tuple of (latitude, longitude) or (None, None) if geocoding failed
     """
+    cached = get_cached_lat_long(address)
+    if cached:
+        return cached
+    
     try:
         # Geocode the address
-        geocode_result = gmaps.geocode(address)
+        geocode_result = get_gmaps_client().geocode(address)
         
         # Extract latitude and longitude
         if geocode_result:
             location = geocode_result[0]['geometry']['location']
+            cache_lat_long(address, location['lat'], location['lng'])
             return location['lat'], location['lng']
             
     except Exception as e:
-        print(f"Geocoding failed: {str(e)}")
+        logger.warning("Geocoding failed for %r: %s", address, e)
     
     return None, None
\ No newline at end of file
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Environment variable naming the directory used to cache LLM responses.
+# Caching is off when it isn't set.
+CACHE_DIR_ENV_VAR = "FS_CACHE_DIR"
+
+# Environment variable with the maximum age of a cached response in hours.
+# Searches are about upcoming events, so old answers go stale.
+CACHE_MAX_AGE_ENV_VAR = "FS_CACHE_MAX_AGE_HOURS"
+DEFAULT_CACHE_MAX_AGE_HOURS = 24
+
+
+def get_cache_dir() -> Optional[str]:
+    """
+    Get the response cache directory from the FS_CACHE_DIR environment variable.
+
+    Returns:
+        str: Cache directory, or None if caching is disabled
+    """
+    return os.getenv(CACHE_DIR_ENV_VAR) or None
+
+def get_cache_max_age() -> timedelta:
+    """
+    Get the maximum age of a cached response from the FS_CACHE_MAX_AGE_HOURS
+    environment variable, falling back to DEFAULT_CACHE_MAX_AGE_HOURS.
+
+    Returns:
+        timedelta: Age after which cached responses are ignored
+    """
+    value = os.getenv(CACHE_MAX_AGE_ENV_VAR)
+    try:
+        hours = float(value) if value else DEFAULT_CACHE_MAX_AGE_HOURS
+    except ValueError:
+        logger.warning("Invalid %s value %r, using %s hours", CACHE_MAX_AGE_ENV_VAR, value, DEFAULT_CACHE_MAX_AGE_HOURS)
+        hours = DEFAULT_CACHE_MAX_AGE_HOURS
+    return timedelta(hours=hours)
+
+def get_cache_key(key_fields: List[Any]) -> str:
+    """
+    Build a cache key from the fields that determine a response. Each field is
+    serialized to JSON and prefixed with its 8-byte length, so different splits
+    of the same text between fields can't produce the same key.
+
+    Args:
+        key_fields (list): JSON-serializable values identifying the request
+
+    Returns:
+        str: Hex SHA-256 digest of the fields
+    """
+    digest = hashlib.sha256()
+    for field in key_fields:
+        encoded = json.dumps(field, sort_keys=True, default=str).encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+def cached_responses_create(client, cache_dir: Optional[str], key_fields: List[Any],
+                            refresh: bool = False,
+                            is_valid: Optional[Callable[[str], bool]] = None, **kwargs):
+    """
+    Call client.responses.create, reusing a response saved on disk for the
+    same key fields if it is younger than get_cache_max_age(). The cache
+    stores only the response text, so a cached result comes back as an
+    object with output_text and usage set to None.
+
+    Args:
+        client: OpenAI client
+        cache_dir (str): Directory holding cached responses, or None to always call the API
+        key_fields (list): JSON-serializable values identifying the request
+        refresh (bool): Skip the cached entry and replace it with a new response,
+            e.g. when retrying because the cached text was unusable
+        is_valid (callable): Check applied to the response text. Responses that
+            fail it are returned but never stored, and cached entries that fail
+            it are ignored
+        **kwargs: Arguments passed to client.responses.create
+
+    Returns:
+        The API response, or the cached equivalent
+    """
+    if not cache_dir:
+        return client.responses.create(**kwargs)
+
+    cache_path = os.path.join(cache_dir, f"{get_cache_key(key_fields)}.json")
+    if not refresh:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            created_at = datetime.fromisoformat(cached["created_at"])
+            if datetime.now(timezone.utc) - created_at > get_cache_max_age():
+                logger.debug("Cached response %s has expired", cache_path)
+            elif is_valid is None or is_valid(cached["output_text"]):
+                return SimpleNamespace(output_text=cached["output_text"], usage=None)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable cached response %s: %s", cache_path, e)
+
+    response = client.responses.create(**kwargs)
+    if is_valid is not None and not is_valid(response.output_text):
+        return response
+
+    # Write to a temporary file and swap it in so concurrent readers never
+    # see a partially written entry
+    os.makedirs(cache_dir, exist_ok=True)
+    data = json.dumps({
+        "output_text": response.output_text,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    })
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # Don't leave a stray temp file behind when the write fails
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return response
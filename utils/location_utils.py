@@ -1,5 +1,6 @@
 import json
 import os
+from functools import lru_cache
 
 from config.constants import CODE_COUNTRY
 
@@ -11,19 +12,32 @@ def get_country_options():
     """
     return sorted([(code, name) for code, name in CODE_COUNTRY.items()], key=lambda x: x[1])
 
+class CityDataUnavailable(Exception):
+    """Raised when a country's city file is missing or unreadable, so the miss isn't cached"""
+
 def get_cities_for_country(country_code):
     """
     Returns a list of cities for the given country code.
     If the country file doesn't exist or can't be read, returns an empty list.
     """
+    try:
+        # Copy so callers can't modify the cached list
+        return list(_load_cities(country_code))
+    except CityDataUnavailable as e:
+        print(e)
+        return []
+
+@lru_cache(maxsize=None)
+def _load_cities(country_code):
+    """
+    Reads the cities for a country code once per process. Only successful
+    reads are cached, so a file that is added or fixed later is picked up.
+    """
     file_path = os.path.join('data', 'prefill_city_data', f"{country_code}.json")
     try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            print(f"City file not found for country code: {country_code}")
-            return []
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return tuple(json.load(f))
+    except FileNotFoundError:
+        raise CityDataUnavailable(f"City file not found for country code: {country_code}")
     except Exception as e:
-        print(f"Error reading city data for {country_code}: {e}")
-        return []
+        raise CityDataUnavailable(f"Error reading city data for {country_code}: {e}")